@@ -0,0 +1,67 @@
+import os
+import re
+import argparse
+
+import cv2
+
+def main(video_source=0, num_frames=300, interval=5, save_dir="./calib_dataset/images"):
+    """
+    INT8 キャリブレーション用に、対象カメラ（または動画）からフレームを保存する関数
+    """
+    # 1. 入力ソースを開く
+    cap = cv2.VideoCapture(video_source)
+    if not cap.isOpened():
+        raise IOError(f"入力ソースを開けませんでした: {video_source}")
+
+    # 2. 保存先フォルダを作成
+    os.makedirs(save_dir, exist_ok=True)
+
+    # 3. interval フレームごとに保存（連続フレームだと似た画像ばかりになるため）
+    print(f"Capturing {num_frames} frames from: {video_source}")
+    saved = 0
+    frame_count = 0
+    while saved < num_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        if frame_count % interval == 0:
+            cv2.imwrite(os.path.join(save_dir, f"calib_{saved:04d}.jpg"), frame)
+            saved += 1
+        frame_count += 1
+
+    cap.release()
+
+    print(f"{saved} 枚のフレームを保存しました: {save_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Capture calibration frames for INT8 export")
+    parser.add_argument(
+        "-video",
+        "--video",
+        type=str,
+        default="0",
+        help="Video file path or camera index (e.g., 0)"
+    )
+    parser.add_argument(
+        "-num-frames",
+        "--num-frames",
+        type=int,
+        default=300,
+        help="Number of frames to save"
+    )
+    parser.add_argument(
+        "-interval",
+        "--interval",
+        type=int,
+        default=5,
+        help="Save every N-th frame"
+    )
+
+    args = parser.parse_args()
+
+    # "0" のように数字だけならカメラ index として扱う
+    video_source = int(args.video) if re.fullmatch(r"\d+", args.video.strip()) else args.video
+
+    main(video_source=video_source, num_frames=args.num_frames, interval=args.interval)
@@ -1,14 +1,15 @@
-from ultralytics import YOLO
 import os
+from yolo_engine import load_model
 
-def predict_image(image_path, model_path, save_dir="predictions"):
+def predict_image(image_path, model_path, save_dir="predictions", int8=False):
     """
     指定した画像ファイルを読み込み、YOLOモデルで予測を実行する関数
+    （int8=True で calib.yaml によりキャリブレーションした INT8 エンジンを使用）
     """
     sub_name = "val"
 
-    # 1. モデルのロード
-    model = YOLO(model_path)
+    # 1. モデルのロード（TensorRT / GPU が無い場合は ONNX。無ければ初回のみ書き出す）
+    model = load_model(model_path, int8=int8)
 
     # 2. 画像の存在確認
     if not os.path.exists(image_path):
@@ -1,7 +1,7 @@
-from ultralytics import YOLO
 import os
 import numpy as np
 import cv2
+from yolo_engine import load_model
 
 def predict_image(image_path,
                   model_path,
@@ -15,8 +15,8 @@ def predict_image(image_path,
     """
     sub_name = "val"
 
-    # 1. モデルのロード
-    model = YOLO(model_path)
+    # 1. モデルのロード（TensorRT / GPU が無い場合は ONNX。無ければ初回のみ書き出す）
+    model = load_model(model_path, task="segment")
 
     # 2. 画像の存在確認
     if not os.path.exists(image_path):
@@ -84,6 +84,9 @@ def predict_image(image_path,
     print("\n--- Exporting contour-only images ---")
     base = os.path.splitext(os.path.basename(image_path))[0]
 
+    # 画像サイズの RGBA（透明背景）キャンバスは 1 枚だけ確保して使い回す（bbox切り出し時は不要）
+    canvas = None if crop_to_bbox else np.zeros((h, w, 4), dtype=np.uint8)
+
     for r_idx, result in enumerate(results):
         boxes = result.boxes
         masks = result.masks
@@ -104,33 +107,52 @@ def predict_image(image_path,
             if poly is None or len(poly) < 3:
                 continue
 
-            # RGBA（透明背景）キャンバスを作る
-            canvas = np.zeros((h, w, 4), dtype=np.uint8)
-
             # polyline描画用に int へ
             pts = np.round(poly).astype(np.int32).reshape((-1, 1, 2))
 
-            # 輪郭線だけ描く（色は白・アルファ255）
-            cv2.polylines(
-                canvas,
-                [pts],
-                isClosed=True,
-                color=(255, 255, 255, 255),  # RGBA
-                thickness=line_thickness
-            )
+            # 輪郭線が描かれる範囲（線幅分広げる）
+            bx, by, bw, bh = cv2.boundingRect(pts)
+            pad = line_thickness + 1
 
-            # bboxで切り出す（任意）
             if crop_to_bbox:
                 x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
                 x1, y1, x2, y2 = map(int, [max(0, x1), max(0, y1), min(w, x2), min(h, y2)])
-                canvas_to_save = canvas[y1:y2, x1:x2]
+
+                # bboxと輪郭線を含む範囲だけの1chマスクに描く
+                # （画像全体に描いてから切り出した場合と同じ画素になる）
+                ux1, uy1 = max(0, min(x1, bx - pad)), max(0, min(y1, by - pad))
+                ux2, uy2 = min(w, max(x2, bx + bw + pad)), min(h, max(y2, by + bh + pad))
+                mask = np.zeros((uy2 - uy1, ux2 - ux1), dtype=np.uint8)
+                cv2.polylines(
+                    mask,
+                    [pts - (ux1, uy1)],
+                    isClosed=True,
+                    color=255,
+                    thickness=line_thickness
+                )
+                mask = mask[y1 - uy1:y2 - uy1, x1 - ux1:x2 - ux1]
+
+                # RGBAはbboxの範囲だけ作る（輪郭線は白・アルファ255）
+                canvas_to_save = cv2.merge([mask, mask, mask, mask])
             else:
+                # 輪郭線だけ描く（色は白・アルファ255）
+                cv2.polylines(
+                    canvas,
+                    [pts],
+                    isClosed=True,
+                    color=(255, 255, 255, 255),  # RGBA
+                    thickness=line_thickness
+                )
                 canvas_to_save = canvas
 
             out_name = f"{base}_obj{i:03d}_{label}_{score:.3f}.png"
             out_path = os.path.join(out_contours_dir, out_name)
             cv2.imwrite(out_path, canvas_to_save)
 
+            # 使い回すキャンバスは描いた範囲だけ消す
+            if not crop_to_bbox:
+                canvas[max(0, by - pad):by + bh + pad, max(0, bx - pad):bx + bw + pad] = 0
+
             print(f"Saved contour: {out_path}")
 
     print(f"\n輪郭画像の保存先: {out_contours_dir}")
@@ -3,7 +3,7 @@ import argparse
 
 from ultralytics import YOLO
 
-def main(model_path="yolo11n-seg.pt"):
+def main(model_path="yolo11n-seg.pt", devices=(0,)):
     # 1. モデルの読み込み（事前学習済みの YOLO11n）
     model = YOLO(model_path)
 
@@ -16,8 +16,11 @@ def main(model_path="yolo11n-seg.pt"):
         data=data_yaml,  # データセット設定ファイルのパス
         epochs=100,       # 学習エポック数（必要に応じて変更）
         imgsz=640,       # 入力画像サイズ
-        device=0,        # GPU:0を使用（CPUで動かす場合は 'cpu'）
-        workers=0,       # 単プロセス指定
+        batch=16 * len(devices),  # バッチサイズ（GPU 1 枚あたり 16）
+        device=list(devices) if len(devices) > 1 else devices[0],  # 複数指定時は DDP で並列学習
+        workers=min(8, max(1, (os.cpu_count() or 1) - 1)),  # データ読み込みの並列数（コア数-1、最大8）
+        cache="ram",     # 画像をRAMにキャッシュ（データセットがRAMに収まらない場合は "disk"）
+        amp=True,        # 混合精度学習
     )
 
     # 4. 結果を出力
@@ -48,7 +51,15 @@ if __name__ == "__main__":
         default="yolo11n-seg.pt",
         help="Path to model file"
     )
+    parser.add_argument(
+        "-devices",
+        "--devices",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="GPU ids to train on (e.g., 0 1 for DDP on two GPUs)"
+    )
 
     args = parser.parse_args()
 
-    main(model_path=args.model)
\ No newline at end of file
+    main(model_path=args.model, devices=args.devices)
\ No newline at end of file
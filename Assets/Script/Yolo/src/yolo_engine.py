@@ -0,0 +1,94 @@
+import os
+import shutil
+
+import torch
+from ultralytics import YOLO
+
+# INT8 キャリブレーション用データセット設定（対象カメラのフレーム ~300 枚）
+CALIB_YAML = "calib.yaml"
+
+
+def _needs_export(pt_path, out_path):
+    """
+    書き出し済みモデルが無い、または .pt の方が新しい（再学習で上書きされた）場合に True を返す関数
+    """
+    return not os.path.exists(out_path) or os.path.getmtime(pt_path) > os.path.getmtime(out_path)
+
+
+def ensure_engine(pt_path, task=None, imgsz=640, int8=False, data=CALIB_YAML):
+    """
+    .pt モデルの隣に TensorRT エンジン(.engine)が無い（または .pt より古い）場合に書き出し、そのパスを返す関数
+    （既定は FP16・動的バッチ。int8=True の場合は data のフレームでキャリブレーションした INT8 エンジン）
+    推論側は YOLO(engine_path) で .pt と同じ predict がそのまま使える
+    """
+    suffix = "_int8.engine" if int8 else ".engine"
+    engine_path = os.path.splitext(pt_path)[0] + suffix
+
+    if _needs_export(pt_path, engine_path):
+        print(f"Exporting TensorRT engine: {pt_path} -> {engine_path}")
+        if int8 and not os.path.exists(data):
+            raise FileNotFoundError(f"キャリブレーション用データセットが見つかりません: {data}")
+
+        # ultralytics は <重みのstem>.engine に書き出すため、INT8 は <stem>_int8.pt のコピーから書き出す
+        # （FP16 の <stem>.engine を上書きしない）
+        export_pt = pt_path
+        if int8:
+            export_pt = os.path.splitext(pt_path)[0] + "_int8.pt"
+            shutil.copy2(pt_path, export_pt)
+
+        try:
+            model = YOLO(export_pt, task=task)
+            model.export(
+                format="engine",          # TensorRT
+                imgsz=imgsz,              # 入力画像サイズ
+                half=not int8,            # FP16
+                int8=int8,                # INT8 (post-training quantization)
+                data=data if int8 else None,  # INT8 キャリブレーション用データセット
+                dynamic=True,             # 動的バッチ/入力サイズ
+                batch=16,                 # 最大バッチサイズ
+                workspace=4,              # ビルド時のワークスペース [GiB]
+                device=0,                 # GPU:0 でビルド
+            )
+        finally:
+            if export_pt != pt_path:
+                os.remove(export_pt)
+
+    return engine_path
+
+
+def ensure_cpu_model(pt_path, task=None, imgsz=640, cpu_format="onnx"):
+    """
+    GPU が無い環境向けに、.pt モデルの隣へ ONNX / OpenVINO モデルが無い（または .pt より古い）場合に書き出し、そのパスを返す関数
+    （cpu_format: "onnx" -> <stem>_cpu.onnx、"openvino" -> <stem>_openvino_model/）
+    """
+    stem = os.path.splitext(pt_path)[0]
+    if cpu_format == "onnx":
+        # <stem>.onnx は TensorRT 書き出しの中間ファイル（動的・FP16）と同名になるため別名にする
+        model_path = stem + "_cpu.onnx"
+        export_args = dict(opset=13, dynamic=False, simplify=True)
+    elif cpu_format == "openvino":
+        model_path = stem + "_openvino_model"
+        export_args = dict(half=True)  # FP16
+    else:
+        raise ValueError(f"未対応の CPU 向け形式です: {cpu_format}")
+
+    if _needs_export(pt_path, model_path):
+        print(f"Exporting {cpu_format} model: {pt_path} -> {model_path}")
+        model = YOLO(pt_path, task=task)
+        exported_path = str(model.export(format=cpu_format, imgsz=imgsz, device="cpu", **export_args))
+        if cpu_format == "onnx":
+            os.replace(exported_path, model_path)
+
+    return model_path
+
+
+def load_model(pt_path, task=None, int8=False, cpu_format="onnx"):
+    """
+    推論用モデルを用意してロードする関数
+    （GPU があれば TensorRT エンジン、無ければ ONNX / OpenVINO。int8 は TensorRT のみ有効）
+    """
+    if torch.cuda.is_available():
+        model_path = ensure_engine(pt_path, task=task, int8=int8)
+    else:
+        model_path = ensure_cpu_model(pt_path, task=task, cpu_format=cpu_format)
+    return YOLO(model_path, task=task)
@@ -10,7 +10,6 @@ Space-Time Image (STI) を用いた簡易流速推定（構造テンソルの全
 依存:
   - opencv-python (cv2)
   - numpy
-  - scipy
   - matplotlib (可視化を行う場合)
 
 使い方例:
@@ -27,12 +26,12 @@ import argparse
 import os
 import re
 import json
+import math
 from dataclasses import dataclass
 from typing import Tuple, Optional, Union
 
 import cv2
 import numpy as np
-from scipy.ndimage import gaussian_filter
 
 
 def find_camera_id_by_name(camera_name: str) -> Optional[int]:
@@ -40,10 +39,12 @@ def find_camera_id_by_name(camera_name: str) -> Optional[int]:
     カメラ名からOpenCVのカメラIDを特定する。
 
     WMIでWindowsが認識しているカメラデバイスを取得し、
-    カメラ名が一致するデバイスのインデックスをOpenCVで試行する。
+    カメラ名が一致するデバイスの列挙順をそのままカメラIDとする。
+    ※ これは推定（ヒューリスティック）である。WMI の列挙順と OpenCV(DirectShow)
+       のインデックスが一致する保証はなく、仮想カメラ等があるとずれる。
 
     Returns:
-        カメラID（0-9）、見つからない場合はNone
+        カメラID、見つからない場合はNone
     """
     try:
         import wmi
@@ -52,18 +53,9 @@ def find_camera_id_by_name(camera_name: str) -> Optional[int]:
         # Windowsが認識しているカメラデバイスを取得
         cameras = c.Win32_PnPEntity(PNPClass="Camera")
 
-        camera_index = 0
-        for cam in cameras:
+        for camera_index, cam in enumerate(cameras):
             if camera_name in cam.Name:
-                # OpenCVで該当IDが開けるか試行
-                for test_id in range(10):
-                    cap = cv2.VideoCapture(test_id)
-                    if cap.isOpened():
-                        cap.release()
-                        # camera_indexと一致したら返す
-                        if test_id == camera_index:
-                            return test_id
-                camera_index += 1
+                return camera_index
 
         return None
     except Exception as e:
@@ -90,12 +82,28 @@ class Config:
     gray: bool = True
 
 
+def build_line_maps(start: Tuple[int, int],
+                    end: Tuple[int, int],
+                    length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ライン上のサンプル座標を cv2.remap 用の (map_x, map_y) として作成します。
+    ラインはフレーム間で変わらないため、ループの外で一度だけ作ればよい。
+    """
+    x0, y0 = start
+    x1, y1 = end
+
+    x_coords = np.linspace(x0, x1, length).astype(np.float32).reshape(1, -1)
+    y_coords = np.linspace(y0, y1, length).astype(np.float32).reshape(1, -1)
+    return x_coords, y_coords
+
+
 def extract_line_pixels(frame: np.ndarray,
                         start: Tuple[int, int],
                         end: Tuple[int, int],
                         length: int,
                         *,
-                        force_gray: bool = True) -> np.ndarray:
+                        force_gray: bool = True,
+                        maps: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
     """
     フレームから指定されたライン上の画素値を抽出します（線形補間）。
     返り値は 1D 配列（length 要素）。
@@ -103,12 +111,11 @@ def extract_line_pixels(frame: np.ndarray,
     - frame: BGR or Gray
     - start/end: (x, y)
     - length: サンプル点数（ピクセル長の近似）
+    - maps: build_line_maps() の結果（省略時は毎回作成）
     """
-    x0, y0 = start
-    x1, y1 = end
-
-    x_coords = np.linspace(x0, x1, length).astype(np.float32).reshape(1, -1)
-    y_coords = np.linspace(y0, y1, length).astype(np.float32).reshape(1, -1)
+    if maps is None:
+        maps = build_line_maps(start, end, length)
+    x_coords, y_coords = maps
 
     # cv2.remap は map_x, map_y を指定
     pixels = cv2.remap(frame, x_coords, y_coords, interpolation=cv2.INTER_LINEAR)
@@ -138,6 +145,12 @@ def generate_sti(cfg: Config) -> np.ndarray:
     if not cap.isOpened():
         raise IOError(f"Cannot open video source: {cfg.video_source}")
 
+    # バッファを最小にして古いフレームを溜めない
+    # 非圧縮(YUY2)だと HD で FPS が落ちるカメラが多いため MJPG を要求する
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+    cap.set(cv2.CAP_PROP_FPS, cfg.fps)
+
     # カメラ情報を出力
     print("=== Camera Information ===")
     print(f"Camera ID: {cfg.video_source}")
@@ -147,10 +160,12 @@ def generate_sti(cfg: Config) -> np.ndarray:
     print("=========================")
 
     # 線分長（ピクセル）を length として使う（ノートブック準拠）
-    line_length_px = int(np.linalg.norm(np.array(cfg.line_start) - np.array(cfg.line_end)))
-    line_length_px = max(line_length_px, 1)
+    (x0, y0), (x1, y1) = cfg.line_start, cfg.line_end
+    line_length_px = max(int(math.hypot(x1 - x0, y1 - y0)), 1)
+    line_maps = build_line_maps(cfg.line_start, cfg.line_end, line_length_px)
 
-    sti_list = []
+    # STI バッファ（行幅はチャンネル数に依存するため、最初のフレームで確保）
+    sti_image: Optional[np.ndarray] = None
     frame_count = 0
 
     while frame_count < cfg.max_frames:
@@ -163,18 +178,21 @@ def generate_sti(cfg: Config) -> np.ndarray:
             cfg.line_start,
             cfg.line_end,
             line_length_px,
-            force_gray=cfg.gray
+            force_gray=cfg.gray,
+            maps=line_maps
         )
-        sti_list.append(line_data)
+        if sti_image is None:
+            sti_image = np.empty((cfg.max_frames, line_data.size), dtype=line_data.dtype)
+        sti_image[frame_count] = line_data
         frame_count += 1
 
     cap.release()
 
-    if not sti_list:
+    if sti_image is None:
         raise RuntimeError("No frames were read from the video source. Check --video or camera availability.")
 
-    sti_image = np.array(sti_list)
-    return sti_image
+    # 途中で動画が終わった場合は読めた分だけ
+    return sti_image[:frame_count]
 
 
 def calculate_velocity_structure_tensor(sti_img: np.ndarray,
@@ -186,24 +204,29 @@ def calculate_velocity_structure_tensor(sti_img: np.ndarray,
     """
     構造テンソル（全体平均）により代表流速を推定。
 
+    テンソル成分のガウス平滑化（reflect 境界）は全体平均を変えないため、
+    平均 Jxx, Jxt は Ix*Ix, Ix*It の平均を直接とって求める。
+    sigma_tensor は互換性のために残しているが、結果には影響しない。
+
     Returns:
       velocity_ms: [m/s]
       v_pix: [px/frame]
     """
-    img_smooth = gaussian_filter(sti_img.astype(np.float32), sigma=sigma_pre)
+    img_smooth = sti_img.astype(np.float32)
+    # scipy.ndimage.gaussian_filter(mode="reflect") と同じ境界処理・カーネル幅
+    # （sigma_pre <= 0 は平滑化なし。cv2.GaussianBlur は sigma=0 だとカーネル幅が 0 になりエラー）
+    if sigma_pre > 0:
+        img_smooth = cv2.GaussianBlur(img_smooth, (0, 0),
+                                      sigmaX=sigma_pre, sigmaY=sigma_pre,
+                                      borderType=cv2.BORDER_REFLECT)
 
     # Ix: 空間方向(横)の微分, It: 時間方向(縦)の微分
-    Ix = cv2.Sobel(img_smooth, cv2.CV_64F, 1, 0, ksize=3)
-    It = cv2.Sobel(img_smooth, cv2.CV_64F, 0, 1, ksize=3)
-
-    Ixx = Ix ** 2
-    Ixt = Ix * It
+    Ix = cv2.Sobel(img_smooth, cv2.CV_32F, 1, 0, ksize=3)
+    It = cv2.Sobel(img_smooth, cv2.CV_32F, 0, 1, ksize=3)
 
-    Jxx = gaussian_filter(Ixx, sigma=sigma_tensor)
-    Jxt = gaussian_filter(Ixt, sigma=sigma_tensor)
-
-    avg_Jxx = float(np.mean(Jxx))
-    avg_Jxt = float(np.mean(Jxt))
+    # 積と総和を 1 パスで計算（Ixx, Ixt の一時配列を作らない）
+    avg_Jxx = float(np.vdot(Ix, Ix)) / Ix.size
+    avg_Jxt = float(np.vdot(Ix, It)) / Ix.size
 
     v_pix = 0.0 if avg_Jxx == 0.0 else (-avg_Jxt / avg_Jxx)
     velocity_ms = v_pix * (spat_res * fps)
@@ -211,6 +234,16 @@ def calculate_velocity_structure_tensor(sti_img: np.ndarray,
     return float(velocity_ms), float(v_pix)
 
 
+def _imwrite(save_path: str, image: np.ndarray) -> None:
+    # cv2.imwrite は Windows で非ASCII（日本語など）を含むパスに書けないため、
+    # エンコードしてから numpy 経由でファイルに書き出す
+    ext = os.path.splitext(save_path)[1] or ".png"
+    ok, buf = cv2.imencode(ext, image)
+    if not ok:
+        raise IOError(f"Failed to encode image: {save_path}")
+    buf.tofile(save_path)
+
+
 def _safe_import_matplotlib():
     # GUIなし環境でも保存だけできるようにする
     import matplotlib
@@ -225,6 +258,12 @@ def plot_sti(sti_image: np.ndarray,
              title: str = "Generated Space-Time Image (STI)",
              save_path: Optional[str] = None,
              show: bool = False) -> None:
+    # 表示しない場合は matplotlib を使わず、STI をそのまま画像として保存
+    if not show:
+        if save_path:
+            _imwrite(save_path, sti_image)
+        return
+
     plt = _safe_import_matplotlib()
     plt.figure(figsize=(10, 6))
     plt.imshow(sti_image, cmap="gray", aspect="auto")
@@ -246,16 +285,28 @@ def plot_sti_with_vector(sti_image: np.ndarray,
                          *,
                          save_path: Optional[str] = None,
                          show: bool = False) -> None:
-    plt = _safe_import_matplotlib()
-    plt.figure(figsize=(10, 6))
-    plt.imshow(sti_image, cmap="gray", aspect="auto")
-
     h, w = sti_image.shape
     center_t, center_x = h // 2, w // 2
 
     t_vals = np.array([0, h], dtype=np.float64)
     x_vals = center_x + v_px_frame * (t_vals - center_t)
 
+    # 表示しない場合は matplotlib を使わず、OpenCV で STI に直接描画して保存
+    if not show:
+        if save_path:
+            canvas = cv2.cvtColor(sti_image.astype(np.uint8), cv2.COLOR_GRAY2BGR)
+            # 極端な流速でも int32 に収まるよう端点を制限（cv2.line が画像外をクリップする）
+            xs = np.clip(np.round(x_vals), -(1 << 20), 1 << 20).astype(int)
+            cv2.line(canvas, (int(xs[0]), 0), (int(xs[1]), h), (0, 0, 255), 2, cv2.LINE_AA)
+            cv2.putText(canvas, f"Est. V = {estimated_velocity:.3f} m/s", (5, 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1, cv2.LINE_AA)
+            _imwrite(save_path, canvas)
+        return
+
+    plt = _safe_import_matplotlib()
+    plt.figure(figsize=(10, 6))
+    plt.imshow(sti_image, cmap="gray", aspect="auto")
+
     plt.plot(
         x_vals, t_vals,
         color="red", linewidth=2, linestyle="--",
@@ -290,7 +341,7 @@ def build_argparser() -> argparse.ArgumentParser:
                    help="Line end (x y) in pixels.")
     p.add_argument("--max-frames", type=int, default=300, help="Number of frames to use to build STI.")
     p.add_argument("--sigma-pre", type=float, default=1.0, help="Gaussian sigma for pre-smoothing STI.")
-    p.add_argument("--sigma-tensor", type=float, default=2.0, help="Gaussian sigma for tensor smoothing.")
+    p.add_argument("--sigma-tensor", type=float, default=2.0, help="Gaussian sigma for tensor smoothing (kept for compatibility; does not affect the global-mean estimate).")
     p.add_argument("--no-gray", action="store_true", help="Do not force grayscale when sampling the line.")
     p.add_argument("--show", action="store_true", help="Show matplotlib windows (if environment supports it).")
     p.add_argument("--output-dir", default="../outputs/",